@@ -25,6 +25,8 @@ class ArbData(object):
     cbor library.
     """
 
+    __slots__ = ('_args', '_json')
+
     def __init__(self, *args, **kwargs):
         """Constructs an ArbData object.
 
@@ -145,6 +147,19 @@ class ArbData(object):
             return self._args == other._args and self._json == other._json
         return False
 
+    def __getstate__(self):
+        """Returns the state of this object for pickling and copying. This is
+        needed because pickle protocols 0 and 1 don't support objects with
+        `__slots__` without it. Subclasses without `__slots__` store their
+        attributes in `__dict__`, so that is included as well."""
+        return (self._args, self._json, getattr(self, '__dict__', None))
+
+    def __setstate__(self, state):
+        """Restores the state returned by `__getstate__()`."""
+        self._args, self._json, attrs = state
+        if attrs:
+            self.__dict__.update(attrs)
+
     @classmethod
     def _from_raw(cls, handle): #@
         """Constructs an ArbData object from a raw API handle."""
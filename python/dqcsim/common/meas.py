@@ -18,6 +18,8 @@ class Measurement(ArbData):
     Python through inheritance.
     """
 
+    __slots__ = ('__qubit', '__value')
+
     def __init__(self, qubit, value, *args, **kwargs):
         """Constructs a Measurement object.
 
@@ -29,6 +31,18 @@ class Measurement(ArbData):
         self.qubit = qubit
         self.value = value
 
+    @classmethod
+    def _unsafe(cls, qubit, value): #@
+        """Constructs a measurement object with empty `ArbData` without
+        validating the qubit and value. The caller must ensure that qubit is
+        a positive integer and that value is 0, 1, or None."""
+        meas = object.__new__(cls)
+        meas._args = []
+        meas._json = {}
+        meas.__qubit = qubit
+        meas.__value = value
+        return meas
+
     @property
     def qubit(self): #@
         """The qubit associated with this measurement."""
@@ -54,9 +68,22 @@ class Measurement(ArbData):
 
     def __eq__(self, other):
         if isinstance(other, Measurement):
-            return super().__eq__(other) and self.qubit == other.qubit and self.value == other.value
+            # Compare the qubit and value first; they're cheap to compare and
+            # usually differ when the measurements aren't equal.
+            if self.__qubit != other.__qubit or self.__value != other.__value:
+                return False
+            return super().__eq__(other)
         return False
 
+    def __getstate__(self):
+        """Returns the state of this object for pickling and copying."""
+        return (super().__getstate__(), self.__qubit, self.__value)
+
+    def __setstate__(self, state):
+        """Restores the state returned by `__getstate__()`."""
+        state, self.__qubit, self.__value = state
+        super().__setstate__(state)
+
     @classmethod
     def _from_raw(cls, handle): #@
         """Constructs a measurement object from a raw API handle."""
@@ -71,7 +98,7 @@ class Measurement(ArbData):
                 value = 1
             else:
                 assert(False)
-            meas = Measurement(raw.dqcs_meas_qubit_get(hndl), value)
+            meas = Measurement._unsafe(raw.dqcs_meas_qubit_get(hndl), value)
         meas._args = arg._args
         meas._json = arg._json
         return meas
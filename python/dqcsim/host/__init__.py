@@ -7,6 +7,13 @@ import sys
 import os
 import zlib
 
+def _hash_seed(seed):
+    """Converts the seed passed to `Simulator.simulate()` to the integer that
+    is passed to DQCsim. See `Simulator.simulate()` for the rules."""
+    if isinstance(seed, int) and seed >= 0 and seed <= 0xFFFFFFFFFFFFFFFF:
+        return seed
+    return zlib.adler32(str(seed).encode('utf-8')) & 0xFFFFFFFF
+
 class Simulator(object):
     """Represents a DQCsim simulator managed by Python.
 
@@ -597,10 +604,7 @@ class Simulator(object):
 
             # Configure the seed.
             if seed is not None:
-                if isinstance(seed, int) and seed >= 0 and seed <= 0xFFFFFFFFFFFFFFFF:
-                    raw.dqcs_scfg_seed_set(scfg, seed)
-                else:
-                    raw.dqcs_scfg_seed_set(scfg, zlib.adler32(str(seed).encode('utf-8')) & 0xFFFFFFFF)
+                raw.dqcs_scfg_seed_set(scfg, _hash_seed(seed))
 
             # Configure reproduction file logging.
             if self._repro is None:
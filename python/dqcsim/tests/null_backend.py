@@ -2,6 +2,10 @@ from dqcsim.common import *
 from dqcsim.plugin import *
 import os
 
+# Zero measurement results returned by NullBackend, by qubit. The results are
+# only converted to DQCsim handles, never modified, so they can be reused.
+ZERO_MEASUREMENTS = {}
+
 @plugin("Null backend plugin", "Test", "0.1")
 class NullBackend(Backend):
     def handle_drop(self):
@@ -11,7 +15,13 @@ class NullBackend(Backend):
         pass
 
     def handle_measurement_gate(self, qubits, matrix, arb):
-        return [Measurement(qubit, 0) for qubit in qubits]
+        measurements = []
+        for qubit in qubits:
+            measurement = ZERO_MEASUREMENTS.get(qubit, None)
+            if measurement is None:
+                measurement = ZERO_MEASUREMENTS[qubit] = Measurement(qubit, 0)
+            measurements.append(measurement)
+        return measurements
 
     def handle_prepare_gate(self, targets, matrix, arb):
         pass
@@ -1,4 +1,4 @@
-import unittest
+import unittest, pickle, copy
 
 from dqcsim.common.arb import ArbData
 from dqcsim import raw
@@ -223,5 +223,22 @@ class Operations(unittest.TestCase):
         a = ArbData(bdata, b=data)
         self.assertEqual(ArbData._from_raw(a._to_raw()), a)
 
+    def test_slots(self):
+        a = ArbData()
+        with self.assertRaises(AttributeError):
+            a.foo = 3
+
+    def test_pickle(self):
+        a = ArbData(b'a', b'b', b=3, c=[4, {"d": 5}])
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                b = pickle.loads(pickle.dumps(a, protocol=protocol))
+                self.assertEqual(type(b), ArbData)
+                self.assertEqual(b, a)
+        b = copy.deepcopy(a)
+        self.assertEqual(b, a)
+        b['c'][1]['d'] = 6
+        self.assertEqual(a['c'][1]['d'], 5)
+
 if __name__ == '__main__':
     unittest.main()
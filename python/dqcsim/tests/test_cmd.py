@@ -1,4 +1,4 @@
-import unittest
+import unittest, pickle, copy
 
 from dqcsim.common.arb import ArbData
 from dqcsim.common.cmd import ArbCmd
@@ -84,5 +84,14 @@ class Tests(unittest.TestCase):
 
         self.assertEqual(ArbCmd._from_raw(a_handle), a)
 
+    def test_pickle(self):
+        a = ArbCmd('x', 'y', b'a', b=3)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                b = pickle.loads(pickle.dumps(a, protocol=protocol))
+                self.assertEqual(type(b), ArbCmd)
+                self.assertEqual(b, a)
+        self.assertEqual(copy.deepcopy(a), a)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,4 @@
-import unittest, logging, os, sys, tempfile, re, math, cmath, pickle
+import unittest, math, pickle
 from dqcsim.common import *
 from dqcsim.host import *
 from dqcsim.plugin import *
@@ -1,4 +1,4 @@
-import unittest, logging, os, sys, tempfile, re, math, cmath, pickle
+import unittest
 from dqcsim.common import *
 from dqcsim.host import *
 from dqcsim.plugin import *
@@ -9,6 +9,34 @@ def catch_errors(fn, *args, **kwargs):
     except Exception as e:
         return str(e)
 
+# Getters reported by the stats command, resolved once when the module is
+# loaded.
+STATS_GETTERS = (
+    GateStreamSource.get_measurement,
+    GateStreamSource.get_cycles_since_measure,
+    GateStreamSource.get_cycles_between_measures,
+)
+
+def stats(plugin, qubits):
+    results = []
+    for qubit in qubits:
+        values = []
+        for getter in STATS_GETTERS:
+            try:
+                values.append(getter(plugin, qubit))
+            except Exception as e:
+                values.append(str(e))
+        measurement, since, between = values
+        if isinstance(measurement, Measurement):
+            measurement = [measurement.qubit, measurement.value]
+        results.append({
+            'm': measurement,
+            's': since,
+            'b': between,
+            'c': plugin.get_cycle(),
+        })
+    return ArbData(stats=results)
+
 @plugin("Test frontend plugin", "Test", "0.1")
 class TestFrontend(Frontend):
     def handle_init(self, _):
@@ -21,33 +49,30 @@ class TestFrontend(Frontend):
         self.advance(cycles)
 
     def handle_host_cmd_arb(self, iface='', op=''):
-        return ArbData(pickle.dumps(catch_errors(self.arb, iface, op)))
+        result = catch_errors(self.arb, iface, op)
+        if isinstance(result, str):
+            return ArbData(error=result)
+        return result
 
-    def handle_host_cmd_stats(self, qubit=1):
-        return ArbData(pickle.dumps((
-            catch_errors(self.get_measurement, qubit),
-            catch_errors(self.get_cycles_since_measure, qubit),
-            catch_errors(self.get_cycles_between_measures, qubit),
-            self.get_cycle()
-        )))
+    def handle_host_cmd_stats(self, qubits=[]):
+        return stats(self, qubits)
 
 @plugin("Null operator plugin", "Test", "0.1")
 class NullOperator(Operator):
-    def handle_host_cmd_stats(self, qubit=1):
-        return ArbData(pickle.dumps((
-            catch_errors(self.get_measurement, qubit),
-            catch_errors(self.get_cycles_since_measure, qubit),
-            catch_errors(self.get_cycles_between_measures, qubit),
-            self.get_cycle()
-        )))
+    def handle_host_cmd_stats(self, qubits=[]):
+        return stats(self, qubits)
 
 @plugin("Test operator 1", "Test", "0.1")
 class TestOperator1(NullOperator):
+    # Offset added to the measured qubit references on the way downstream,
+    # and subtracted again from the measurement results on the way back.
+    QUBIT_OFFSET = 1
+
     def handle_measurement_gate(self, measures, matrix, arb):
-        self.measure([q+1 for q in measures])
+        self.measure([q + self.QUBIT_OFFSET for q in measures])
 
     def handle_measurement(self, measurement):
-        measurement.qubit -= 1
+        measurement.qubit -= self.QUBIT_OFFSET
         measurement.value = True
         return measurement
 
@@ -80,7 +105,7 @@ class NullBackend(Backend):
         pass
 
     def handle_measurement_gate(self, measures, matrix, arb):
-        return [Measurement(qubit, False) for qubit in measures]
+        return [Measurement._unsafe(qubit, 0) for qubit in measures]
 
     def handle_prepare_gate(self, targets, matrix, arb):
         pass
@@ -88,210 +113,148 @@ class NullBackend(Backend):
     def handle_upstream_a_b(self):
         return ArbData(b'back')
 
-class Tests(unittest.TestCase):
-    def test_null_operator(self):
-        sim = Simulator(
-            TestFrontend(), NullOperator(), NullBackend(),
-            repro=None, stderr_verbosity=Loglevel.ERROR
-        )
-        sim.simulate()
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 0),
-            0,
-            'Invalid argument: qubit 1 has only been measured once',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'advance', cycles=10)
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 0),
-            10,
-            'Invalid argument: qubit 1 has only been measured once',
-            10,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 0),
-            0,
-            10,
-            10,
-        ))
-
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='b')[0]),
-            ArbData(b'back'))
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='a')[0]),
-            'Invalid operation ID a for interface ID a')
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='b')[0]),
-            ArbData())
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='a')[0]),
-            ArbData())
-
-        sim.stop()
-
-    def test_operator1(self):
-        sim = Simulator(
-            TestFrontend(), TestOperator1(), NullBackend(),
-            repro=None, stderr_verbosity=Loglevel.ERROR
-        )
-        sim.simulate()
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            0,
-        ))
-        self.assertEqual(pickle.loads(sim.arb('op1', 'cmd', 'stats', qubit=2)[0]), (
-            'Invalid argument: qubit 2 has not been measured yet',
-            'Invalid argument: qubit 2 has not been measured yet',
-            'Invalid argument: qubit 2 has not been measured yet',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 1),
-            0,
-            'Invalid argument: qubit 1 has only been measured once',
-            0,
-        ))
-        self.assertEqual(pickle.loads(sim.arb('op1', 'cmd', 'stats', qubit=2)[0]), (
-            Measurement(2, 0),
-            0,
-            'Invalid argument: qubit 2 has only been measured once',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'advance', cycles=10)
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 1),
-            10,
-            'Invalid argument: qubit 1 has only been measured once',
-            10,
-        ))
-        self.assertEqual(pickle.loads(sim.arb('op1', 'cmd', 'stats', qubit=2)[0]), (
-            Measurement(2, 0),
-            20,
-            'Invalid argument: qubit 2 has only been measured once',
-            20,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 1),
-            0,
-            10,
-            10,
-        ))
-        self.assertEqual(pickle.loads(sim.arb('op1', 'cmd', 'stats', qubit=2)[0]), (
-            Measurement(2, 0),
-            0,
-            20,
-            20,
-        ))
-
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='b')[0]),
-            ArbData(b'back'))
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='a')[0]),
-            'Invalid operation ID a for interface ID a')
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='b')[0]),
-            ArbData(b'oper'))
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='a')[0]),
-            'Invalid operation ID a for interface ID b')
-
-        sim.stop()
-
-    def test_operator2(self):
-        sim = Simulator(
-            TestFrontend(), TestOperator2(), NullBackend(),
-            repro=None, stderr_verbosity=Loglevel.ERROR
-        )
-        sim.simulate()
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 1),
-            0,
-            'Invalid argument: qubit 1 has only been measured once',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'advance', cycles=10)
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 1),
-            10,
-            'Invalid argument: qubit 1 has only been measured once',
-            10,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, 1),
-            0,
-            10,
-            10,
-        ))
-
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='b')[0]),
-            'Invalid operation ID b for interface ID a')
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='a')[0]),
-            ArbData(b'oper'))
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='b')[0]),
-            ArbData())
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='a')[0]),
-            ArbData())
-
-        sim.stop()
-
-    def test_operator3(self):
-        sim = Simulator(
-            TestFrontend(), TestOperator3(), NullBackend(),
+ERR_NOT_MEASURED = 'Invalid argument: qubit {} has not been measured yet'
+ERR_ONCE = 'Invalid argument: qubit {} has only been measured once'
+
+# Expected results of the arb command.
+ARB_BACK = ArbData(b'back')
+ARB_OPER = ArbData(b'oper')
+ARB_EMPTY = ArbData()
+
+# Keys of the dictionaries returned by the stats command for each qubit,
+# representing the measurement, cycles since the latest measurement, cycles
+# between the latest two measurements, and the current cycle.
+STATS_KEYS = ('m', 's', 'b', 'c')
+
+# Names of the stages at which the stats are checked, along with the frontend
+# command issued by the host to get there.
+STAGES = [
+    ('initial', None),
+    ('measured', ('measure', {'measures': [1]})),
+    ('advanced', ('advance', {'cycles': 10})),
+    ('remeasured', ('measure', {'measures': [1]})),
+]
+
+def expected_stats(qubit, value, scale):
+    """Returns the expected (measurement, since, between, cycle) tuple for
+    each of the `STAGES`, given the qubit as seen by the queried plugin, the
+    measurement value it should observe, and the factor by which the cycle
+    counts it sees are scaled by the plugins downstream of it."""
+    not_measured = ERR_NOT_MEASURED.format(qubit)
+    once = ERR_ONCE.format(qubit)
+    measurement = [qubit, value]
+    cycles = 10 * scale
+    return [
+        (not_measured, not_measured, not_measured, 0),
+        (measurement, 0, once, 0),
+        (measurement, cycles, once, cycles),
+        (measurement, 0, cycles, cycles),
+    ]
+
+class OperatorTests(object):
+    """Mixin for the test cases below. Runs a single simulation with the
+    operator class specified by `OPERATOR` for the whole test case."""
+
+    OPERATOR = None
+
+    # List of (plugin, qubit, value, scale) tuples specifying which stats to
+    # check; see `expected_stats()`.
+    STATS = []
+
+    # List of (iface, op, expected) tuples specifying the expected results of
+    # the arbs sent by the frontend.
+    ARBS = []
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sim = Simulator(
+            TestFrontend(), cls.OPERATOR(), NullBackend(),
             repro=None, stderr_verbosity=Loglevel.ERROR
         )
-        sim.simulate()
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            'Invalid argument: qubit 1 has not been measured yet',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, None),
-            0,
-            'Invalid argument: qubit 1 has only been measured once',
-            0,
-        ))
-        sim.arb('front', 'cmd', 'advance', cycles=10)
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, None),
-            10,
-            'Invalid argument: qubit 1 has only been measured once',
-            10,
-        ))
-        sim.arb('front', 'cmd', 'measure', measures=[1])
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'stats', qubit=1)[0]), (
-            Measurement(1, None),
-            0,
-            10,
-            10,
-        ))
-
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='b')[0]),
-            ArbData(b'oper'))
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='a', op='a')[0]),
-            'Invalid operation ID a for interface ID a')
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='b')[0]),
-            ArbData())
-        self.assertEqual(pickle.loads(sim.arb('front', 'cmd', 'arb', iface='b', op='a')[0]),
-            ArbData())
-
-        sim.stop()
+        cls.sim.simulate()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sim.stop()
+
+    def _assert_stats(self, plugin, qubits, expected):
+        """Queries the stats for all the given qubits of a plugin with a
+        single arb and checks them against the list of expected stat
+        tuples."""
+        self.assertEqual(
+            self.sim.arb(plugin, 'cmd', 'stats', qubits=qubits)['stats'],
+            [dict(zip(STATS_KEYS, stats)) for stats in expected])
+
+    def test_stats(self):
+        queries = {}
+        for plugin, qubit, value, scale in self.STATS:
+            queries.setdefault(plugin, []).append(
+                (qubit, expected_stats(qubit, value, scale)))
+        for stage, (name, cmd) in enumerate(STAGES):
+            if cmd is not None:
+                self.sim.arb('front', 'cmd', cmd[0], **cmd[1])
+            for plugin, query in queries.items():
+                with self.subTest(stage=name, plugin=plugin):
+                    self._assert_stats(
+                        plugin,
+                        [qubit for qubit, _ in query],
+                        [stats[stage] for _, stats in query])
+
+    def test_arb(self):
+        for iface, op, expected in self.ARBS:
+            with self.subTest(iface=iface, op=op):
+                self.assertEqual(
+                    self.sim.arb('front', 'cmd', 'arb', iface=iface, op=op),
+                    expected)
+
+class NullOperatorTests(OperatorTests, unittest.TestCase):
+    OPERATOR = NullOperator
+    STATS = [
+        ('front', 1, 0, 1),
+    ]
+    ARBS = [
+        ('a', 'b', ARB_BACK),
+        ('a', 'a', ArbData(error='Invalid operation ID a for interface ID a')),
+        ('b', 'b', ARB_EMPTY),
+        ('b', 'a', ARB_EMPTY),
+    ]
+
+class Operator1Tests(OperatorTests, unittest.TestCase):
+    OPERATOR = TestOperator1
+    STATS = [
+        ('front', 1, 1, 1),
+        ('op1', 2, 0, 2),
+    ]
+    ARBS = [
+        ('a', 'b', ARB_BACK),
+        ('a', 'a', ArbData(error='Invalid operation ID a for interface ID a')),
+        ('b', 'b', ARB_OPER),
+        ('b', 'a', ArbData(error='Invalid operation ID a for interface ID b')),
+    ]
+
+class Operator2Tests(OperatorTests, unittest.TestCase):
+    OPERATOR = TestOperator2
+    STATS = [
+        ('front', 1, 1, 1),
+    ]
+    ARBS = [
+        ('a', 'b', ArbData(error='Invalid operation ID b for interface ID a')),
+        ('a', 'a', ARB_OPER),
+        ('b', 'b', ARB_EMPTY),
+        ('b', 'a', ARB_EMPTY),
+    ]
+
+class Operator3Tests(OperatorTests, unittest.TestCase):
+    OPERATOR = TestOperator3
+    STATS = [
+        ('front', 1, None, 1),
+    ]
+    ARBS = [
+        ('a', 'b', ARB_OPER),
+        ('a', 'a', ArbData(error='Invalid operation ID a for interface ID a')),
+        ('b', 'b', ARB_EMPTY),
+        ('b', 'a', ARB_EMPTY),
+    ]
 
 
 if __name__ == '__main__':
@@ -5,20 +5,26 @@ from dqcsim import raw
 
 class Tests(unittest.TestCase):
 
-    def test_normal(self):
-        xh = raw.dqcs_arb_new()
-        h = Handle(xh)
-
-        self.assertTrue(bool(h))
-        self.assertEqual(int(h), xh)
-        self.assertEqual(str(h), """ArbData(
+    # Expected string representation of a handle to an empty ArbData object.
+    EMPTY_ARB_STR = """ArbData(
     ArbData {
         json: Map(
             {},
         ),
         args: [],
     },
-)""")
+)"""
+
+    # Expected string representation of a handle that has been taken.
+    NONE_STR = "Handle(None)"
+
+    def test_normal(self):
+        xh = raw.dqcs_arb_new()
+        h = Handle(xh)
+
+        self.assertTrue(bool(h))
+        self.assertEqual(int(h), xh)
+        self.assertEqual(str(h), self.EMPTY_ARB_STR)
         self.assertEqual(repr(h), """Handle({})""".format(xh))
         self.assertEqual(h.get_type(), raw.DQCS_HTYPE_ARB_DATA)
         self.assertFalse(h.is_type(raw.DQCS_HTYPE_INVALID))
@@ -38,14 +44,7 @@ class Tests(unittest.TestCase):
 
         self.assertTrue(bool(h))
         self.assertEqual(int(h), xh)
-        self.assertEqual(str(h), """ArbData(
-    ArbData {
-        json: Map(
-            {},
-        ),
-        args: [],
-    },
-)""")
+        self.assertEqual(str(h), self.EMPTY_ARB_STR)
         self.assertEqual(repr(h), """Handle({})""".format(xh))
         self.assertEqual(h.get_type(), raw.DQCS_HTYPE_ARB_DATA)
         self.assertFalse(h.is_type(raw.DQCS_HTYPE_INVALID))
@@ -58,8 +57,8 @@ class Tests(unittest.TestCase):
         self.assertFalse(bool(h))
         with self.assertRaises(ValueError):
             int(h)
-        self.assertEqual(str(h), """Handle(None)""")
-        self.assertEqual(repr(h), """Handle(None)""")
+        self.assertEqual(str(h), self.NONE_STR)
+        self.assertEqual(repr(h), self.NONE_STR)
         with self.assertRaises(ValueError):
             h.get_type(), raw.DQCS_HTYPE_INVALID
         with self.assertRaises(ValueError):
@@ -110,8 +109,8 @@ class Tests(unittest.TestCase):
         self.assertFalse(bool(h))
         with self.assertRaises(ValueError):
             int(h)
-        self.assertEqual(str(h), """Handle(None)""")
-        self.assertEqual(repr(h), """Handle(None)""")
+        self.assertEqual(str(h), self.NONE_STR)
+        self.assertEqual(repr(h), self.NONE_STR)
         with self.assertRaises(ValueError):
             h.get_type(), raw.DQCS_HTYPE_INVALID
         with self.assertRaises(ValueError):
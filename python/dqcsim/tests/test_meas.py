@@ -1,4 +1,4 @@
-import unittest
+import unittest, pickle, copy
 
 from dqcsim.common.arb import ArbData
 from dqcsim.common.meas import Measurement
@@ -40,6 +40,29 @@ class Tests(unittest.TestCase):
         self.assertFalse(a == Measurement(2, 1))
         self.assertFalse(a == ArbData())
         self.assertFalse(a == Measurement(1, 1, b"a"))
+        self.assertFalse(Measurement(1, 1, b"a") == Measurement(1, 1, b"b"))
+        self.assertTrue(Measurement(1, None, b"a") == Measurement(1, None, b"a"))
+
+    def test_unsafe(self):
+        a = Measurement._unsafe(3, None)
+        self.assertEqual(a, Measurement(3, None))
+        self.assertEqual(repr(a), "Measurement(3, None)")
+        a.append(b"a")
+        self.assertEqual(a, Measurement(3, None, b"a"))
+
+    def test_slots(self):
+        a = Measurement(1, 0)
+        with self.assertRaises(AttributeError):
+            a.foo = 3
+
+    def test_pickle(self):
+        for a in [Measurement(1, 0), Measurement(2, None, b"a", b=3), Measurement._unsafe(3, 1)]:
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(measurement=a, protocol=protocol):
+                    b = pickle.loads(pickle.dumps(a, protocol=protocol))
+                    self.assertEqual(type(b), Measurement)
+                    self.assertEqual(b, a)
+            self.assertEqual(copy.deepcopy(a), a)
 
     def test_handles(self):
         a = Measurement(33, 1, b'a', b'b', b'c', b=3, c=4, d=5)
@@ -1,4 +1,4 @@
-import unittest, logging, os, sys, tempfile, re
+import unittest, sys, tempfile, re
 from dqcsim.common import *
 from dqcsim.host import *
 from dqcsim.plugin import *
@@ -106,11 +106,9 @@ class Tests(unittest.TestCase):
             def handle_run(self, *args, **kwargs):
                 pass
             def handle_host_test_random(self):
-                def check_u64(x):
-                    return type(x) == int and x >= 0 and x <= 0xFFFFFFFFFFFFFFFF
                 return ArbData(
                     f64=[self.random_float() for _ in range(100)],
-                    u64=list(map(check_u64, (self.random_long() for _ in range(100)))))
+                    u64=[self.random_long() for _ in range(100)])
         fe = TestFrontend()
         with self.assertRaisesRegex(RuntimeError, "Cannot call plugin operator outside of a callback"):
             fe.random_float()
@@ -129,7 +127,9 @@ class Tests(unittest.TestCase):
             self.assertTrue(f64 >= 0.0)
             self.assertTrue(f64 < 1.0)
         for u64 in x['u64']:
-            self.assertTrue(u64)
+            self.assertEqual(type(u64), int)
+            self.assertTrue(u64 >= 0)
+            self.assertTrue(u64 <= 0xFFFFFFFFFFFFFFFF)
 
 
 if __name__ == '__main__':
@@ -1,73 +1,118 @@
-import unittest, logging, os, sys, tempfile
+import unittest, os, sys, re, shutil, tempfile
 from dqcsim.common import *
 from dqcsim.host import *
 from dqcsim.plugin import *
+from dqcsim.tests.null_frontend import NullFrontend
+from dqcsim.tests.null_operator import NullOperator
+from dqcsim.tests.null_backend import NullBackend
 
-os.environ['PYTHONPATH'] = ':'.join([os.getcwd() + '/python'] + os.environ.get('PYTHONPATH', '').split(':'))
-os.environ['PATH'] = ':'.join([os.getcwd() + '/python/bin'] + os.environ.get('PATH', '').split(':'))
+def prepend_path(var, path):
+    """Prepends path to the os.pathsep-separated list in environment variable
+    var, unless it is already in there."""
+    paths = os.environ.get(var, '')
+    if path not in paths.split(os.pathsep):
+        os.environ[var] = os.pathsep.join((path, paths)) if paths else path
 
-p = os.path.dirname(__file__) + '/'
+cwd = os.getcwd()
+prepend_path('PYTHONPATH', cwd + '/python')
+prepend_path('PATH', cwd + '/python/bin')
+
+# Paths to the plugin scripts in this directory, by filename.
+SCRIPTS = {
+    name: os.path.join(os.path.dirname(__file__), name)
+    for name in ('null_frontend.py', 'null_operator.py', 'null_backend.py')
+}
+
+# Spawning the plugins as separate Python processes is slow, so tests that
+# need to do this only run when DQCSIM_SLOW_TESTS is set. The in-process
+# equivalents are always run.
+slow = unittest.skipUnless(
+    'DQCSIM_SLOW_TESTS' in os.environ,
+    'set DQCSIM_SLOW_TESTS to run subprocess-based tests')
+
+# The dqcs*py launchers used to run plugin scripts invoke python3 through the
+# PATH, so tests using them can only run if it exists.
+needs_python3 = unittest.skipUnless(
+    shutil.which('python3'),
+    'python3 is not available on the PATH')
+
+# Markers that test_tee looks for in the log files.
+TEE_MARKERS = re.compile('Trace|Info|null frontend dropped!|null backend dropped!')
+
+def tee_markers(fname):
+    """Returns the set of `TEE_MARKERS` found in the given log file, scanning
+    it only once."""
+    with open(fname, 'r') as f:
+        return set(TEE_MARKERS.findall(f.read()))
+
+# List of (init arbs passed to the frontend, arbs it should have received)
+# tuples for test_init_arbs.
+INIT_ARBS = [
+    (ArbCmd('x', 'y'), [
+        {'iface': 'x', 'oper': 'y', 'args': [], 'kwargs': {}},
+    ]),
+    ([ArbCmd('x', 'y', b'a'), ArbCmd('y', 'z', b'b')], [
+        {'iface': 'x', 'oper': 'y', 'args': [b'a'], 'kwargs': {}},
+        {'iface': 'y', 'oper': 'z', 'args': [b'b'], 'kwargs': {}},
+    ]),
+]
 
 class Tests(unittest.TestCase):
 
+    def test_null_threads(self):
+        Simulator(
+            NullFrontend(), NullOperator(), NullBackend(),
+            repro=None, stderr_verbosity=Loglevel.ERROR
+        ).run()
+
+    @slow
+    @needs_python3
     def test_null_processes(self):
         Simulator(
-            p+'null_frontend.py',
-            p+'null_operator.py',
-            (sys.executable, p+'null_backend.py'),
+            SCRIPTS['null_frontend.py'],
+            SCRIPTS['null_operator.py'],
+            (sys.executable, SCRIPTS['null_backend.py']),
             repro=None, stderr_verbosity=Loglevel.ERROR
         ).run()
 
+    @slow
+    @needs_python3
     def test_env(self):
         os.environ['x'] = 'x'
         sim = Simulator(
-            (p+'null_frontend.py', {'env': {'x': 'y'}}),
-            (sys.executable, p+'null_backend.py', {'env': {'x': None}, 'work': os.getcwd() + '/..'}),
+            (SCRIPTS['null_frontend.py'], {'env': {'x': 'y'}}),
+            (sys.executable, SCRIPTS['null_backend.py'], {'env': {'x': None}, 'work': cwd + '/..'}),
             repro=None, stderr_verbosity=Loglevel.ERROR
         )
         sim.simulate()
         front = sim.arb('front', 'work', 'env')
         self.assertEqual(front['env']['x'], 'y')
-        self.assertEqual(front['work'], os.getcwd())
+        self.assertEqual(front['work'], cwd)
         back = sim.arb('back', 'work', 'env')
         self.assertTrue('x' not in back['env'])
-        self.assertEqual(back['work'], os.path.dirname(os.getcwd()))
+        self.assertEqual(back['work'], os.path.dirname(cwd))
         sim.stop()
 
     def test_init_arbs(self):
-        sim = Simulator(
-            (p+'null_frontend.py', {'init': ArbCmd('x', 'y')}),
-            p+'null_backend.py',
-            repro=None, stderr_verbosity=Loglevel.ERROR
-        )
-        sim.simulate()
-        self.assertEqual(sim.arb('front', 'get', 'arbs')['data'], [
-            {'iface': 'x', 'oper': 'y', 'args': [], 'kwargs': {}},
-        ])
-        sim.stop()
-
-        sim = Simulator(
-            (p+'null_frontend.py', {'init': [
-                ArbCmd('x', 'y', b'a'), ArbCmd('y', 'z', b'b')
-            ]}),
-            p+'null_backend.py',
-            repro=None, stderr_verbosity=Loglevel.ERROR
-        )
-        sim.simulate()
-        self.assertEqual(sim.arb('front', 'get', 'arbs')['data'], [
-            {'iface': 'x', 'oper': 'y', 'args': [b'a'], 'kwargs': {}},
-            {'iface': 'y', 'oper': 'z', 'args': [b'b'], 'kwargs': {}},
-        ])
-        sim.stop()
+        for init, expected in INIT_ARBS:
+            with self.subTest(init=init):
+                sim = Simulator(
+                    (NullFrontend(), {'init': init}),
+                    NullBackend(),
+                    repro=None, stderr_verbosity=Loglevel.ERROR
+                )
+                sim.simulate()
+                self.assertEqual(sim.arb('front', 'get', 'arbs')['data'], expected)
+                sim.stop()
 
     def test_tee(self):
         with tempfile.TemporaryDirectory() as base:
             sim = Simulator(
-                (p+'null_frontend.py', {'tee': {
+                (NullFrontend(), {'tee': {
                     base+'/front_trace.log': Loglevel.TRACE,
                     base+'/front_info.log': Loglevel.INFO,
                 }}),
-                (p+'null_backend.py', {'tee': {
+                (NullBackend(), {'tee': {
                     base+'/back_trace.log': Loglevel.TRACE,
                 }}),
                 repro=None, stderr_verbosity=Loglevel.ERROR
@@ -75,29 +120,27 @@ class Tests(unittest.TestCase):
             sim.simulate()
             sim.stop()
 
-            with open(base+'/front_trace.log', 'r') as f:
-                f = f.read()
-                self.assertTrue('Trace' in f)
-                self.assertTrue('null frontend dropped!' in f)
-                self.assertFalse('null backend dropped!' in f)
-
-            with open(base+'/front_info.log', 'r') as f:
-                f = f.read()
-                self.assertFalse('Trace' in f)
-                self.assertTrue('Info' in f)
-                self.assertFalse('null frontend dropped!' in f)
-                self.assertFalse('null backend dropped!' in f)
-
-            with open(base+'/back_trace.log', 'r') as f:
-                f = f.read()
-                self.assertTrue('Trace' in f)
-                self.assertFalse('null frontend dropped!' in f)
-                self.assertTrue('null backend dropped!' in f)
+            markers = tee_markers(base+'/front_trace.log')
+            self.assertTrue('Trace' in markers)
+            self.assertTrue('null frontend dropped!' in markers)
+            self.assertFalse('null backend dropped!' in markers)
+
+            markers = tee_markers(base+'/front_info.log')
+            self.assertFalse('Trace' in markers)
+            self.assertTrue('Info' in markers)
+            self.assertFalse('null frontend dropped!' in markers)
+            self.assertFalse('null backend dropped!' in markers)
+
+            markers = tee_markers(base+'/back_trace.log')
+            self.assertTrue('Trace' in markers)
+            self.assertFalse('null frontend dropped!' in markers)
+            self.assertTrue('null backend dropped!' in markers)
 
+    @needs_python3
     def test_stdout_stderr_passthrough(self):
         sim = Simulator(
-            (p+'null_frontend.py', {'stdout': None}),
-            (p+'null_backend.py', {'stderr': None}),
+            (SCRIPTS['null_frontend.py'], {'stdout': None}),
+            (SCRIPTS['null_backend.py'], {'stderr': None}),
             repro=None, stderr_verbosity=Loglevel.ERROR
         )
         # This just checks that the following doesn't raise any errors. We
@@ -105,10 +148,11 @@ class Tests(unittest.TestCase):
         sim.simulate()
         sim.stop()
 
+    @needs_python3
     def test_reproduction(self):
         with tempfile.TemporaryDirectory() as base:
             sim = Simulator(
-                p+'null_frontend.py', p+'null_backend.py',
+                SCRIPTS['null_frontend.py'], SCRIPTS['null_backend.py'],
                 stderr_verbosity=Loglevel.ERROR
             )
             # This just checks that a reproduction file is generated. It
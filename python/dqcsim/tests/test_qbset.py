@@ -1,58 +1,29 @@
-import unittest
+import unittest, re
 
 from dqcsim.common.qbset import QubitSet
 from dqcsim import raw
 
-class Tests(unittest.TestCase):
-
-    def test_all(self):
-        a = QubitSet._to_raw()
-        self.assertEqual(str(a), """QubitReferenceSet(
-    [],
-)""")
-        self.assertEqual(QubitSet._from_raw(a), [])
+def compact(s):
+    """Strips all whitespace from the given debug representation."""
+    return re.sub(r'\s+', '', s)
 
-        a = QubitSet._to_raw(1)
-        self.assertEqual(str(a), """QubitReferenceSet(
-    [
-        QubitRef(
-            1,
-        ),
-    ],
-)""")
-        self.assertEqual(QubitSet._from_raw(a), [1])
+# List of (arguments to _to_raw(), expected compacted debug representation,
+# expected result of _from_raw()) tuples.
+CASES = [
+    ((), 'QubitReferenceSet([],)', []),
+    ((1,), 'QubitReferenceSet([QubitRef(1,),],)', [1]),
+    ((1, 2, 3), 'QubitReferenceSet([QubitRef(1,),QubitRef(2,),QubitRef(3,),],)', [1, 2, 3]),
+    (([1, 2, 3],), 'QubitReferenceSet([QubitRef(1,),QubitRef(2,),QubitRef(3,),],)', [1, 2, 3]),
+]
 
-        a = QubitSet._to_raw(1, 2, 3)
-        self.assertEqual(str(a), """QubitReferenceSet(
-    [
-        QubitRef(
-            1,
-        ),
-        QubitRef(
-            2,
-        ),
-        QubitRef(
-            3,
-        ),
-    ],
-)""")
-        self.assertEqual(QubitSet._from_raw(a), [1, 2, 3])
+class Tests(unittest.TestCase):
 
-        a = QubitSet._to_raw([1, 2, 3])
-        self.assertEqual(str(a), """QubitReferenceSet(
-    [
-        QubitRef(
-            1,
-        ),
-        QubitRef(
-            2,
-        ),
-        QubitRef(
-            3,
-        ),
-    ],
-)""")
-        self.assertEqual(QubitSet._from_raw(a), [1, 2, 3])
+    def test_all(self):
+        for args, expected_str, expected_list in CASES:
+            with self.subTest(args=args):
+                a = QubitSet._to_raw(*args)
+                self.assertEqual(compact(str(a)), expected_str)
+                self.assertEqual(QubitSet._from_raw(a), expected_list)
 
         with self.assertRaises(RuntimeError):
             a = QubitSet._to_raw([1, 2, 1])
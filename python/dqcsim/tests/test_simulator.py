@@ -1,6 +1,7 @@
-import unittest, logging, os, sys, tempfile
+import unittest, logging, sys, tempfile
 from dqcsim.common import *
 from dqcsim.host import *
+from dqcsim.host import _hash_seed
 from dqcsim.plugin import *
 
 @plugin("Null frontend plugin", "Test", "0.1")
@@ -49,33 +50,93 @@ class NullBackend(Backend):
     def handle_measurement_gate(self, qubits):
         return [Measurement(qubit, 0) for qubit in qubits]
 
-class Tests(unittest.TestCase):
-
-    def test_meta_and_state_errors(self):
-        sim = Simulator(
+# Messages logged by NullFrontend.handle_host_log_test() between the start and
+# end markers, as captured by test_log_capture_callback.
+LOG_TEST_CALLBACK = [
+    ('trace',                    Loglevel.TRACE, 18),
+    ('debug',                    Loglevel.DEBUG, 19),
+    ('info',                     Loglevel.INFO,  20),
+    ('note',                     Loglevel.NOTE,  21),
+    ('warn',                     Loglevel.WARN,  22),
+    ('error',                    Loglevel.ERROR, 23),
+    ('fatal',                    Loglevel.FATAL, 24),
+    ('log 33 test',              Loglevel.INFO,  25),
+    ('level must be a Loglevel', Loglevel.ERROR, 29),
+]
+
+# The same messages, as captured by test_log_capture_logging.
+LOG_TEST_LOGGING = [
+    ('trace',                     5, 'TRACE',    __file__, 18),
+    ('debug',                    10, 'DEBUG',    __file__, 19),
+    ('info',                     20, 'INFO',     __file__, 20),
+    ('note',                     25, 'NOTE',     __file__, 21),
+    ('warn',                     30, 'WARNING',  __file__, 22),
+    ('error',                    40, 'ERROR',    __file__, 23),
+    ('fatal',                    50, 'CRITICAL', __file__, 24),
+    ('log 33 test',              20, 'INFO',     __file__, 25),
+    ('level must be a Loglevel', 40, 'ERROR',    __file__, 29),
+]
+
+# List of (Simulator keyword arguments, expected exception type, expected
+# substring of the message or None) tuples for test_usage_errors.
+BAD_KWARGS = [
+    ({'repro': 'invalid'}, TypeError, "repro must be 'keep', 'absolute', 'relative', or None"),
+    ({'dqcsim_verbosity': 'invalid'}, TypeError, "dqcsim_verbosity must be a Loglevel"),
+    ({'stderr_verbosity': 'invalid'}, TypeError, "stderr_verbosity must be a Loglevel"),
+    ({'log_capture': 33}, TypeError, "log_capture must be callable or a string identifying a logger from the logging library"),
+    ({'log_capture_verbosity': 'invalid'}, TypeError, "log_capture_verbosity must be a Loglevel"),
+    ({'tee': 'invalid'}, ValueError, None),
+    ({'tee': {3: Loglevel.TRACE}}, TypeError, "tee file key must be a string"),
+    ({'tee': {'string': 3}}, TypeError, "tee file value must be a Loglevel"),
+    ({'invalid': 3}, TypeError, "unexpected keyword argument 'invalid'"),
+]
+
+# Same as BAD_KWARGS, but for plugin specifications.
+BAD_PLUGINS = [
+    ((Frontend(), {'init': 'invalid'}), TypeError, "init must be a single ArbCmd or a list/tuple of ArbCmds"),
+    ((Frontend(), {'verbosity': 'invalid'}), TypeError, "verbosity must be a Loglevel"),
+    ((Frontend(), {'tee': 'invalid'}), ValueError, None),
+    ((Frontend(), {'tee': {3: Loglevel.TRACE}}), TypeError, "tee file key must be a string"),
+    ((Frontend(), {'tee': {'string': 3}}), TypeError, "tee file value must be a Loglevel"),
+    (('null', {'env': 'invalid'}), ValueError, None),
+    (('null', {'env': {3: None}}), TypeError, "environment variable key must be a string"),
+    (('null', {'env': {'test': 3}}), TypeError, "environment variable value must be a string or None"),
+    (('null', {'stderr': 3}), TypeError, "stderr must be a Loglevel or None"),
+    (('null', {'stdout': 3}), TypeError, "stdout must be a Loglevel or None"),
+    (('null', {'invalid': 3}), TypeError, "unexpected keyword argument 'invalid'"),
+]
+
+# List of (init arbs passed to the frontend, arbs it should have received)
+# tuples for test_init_arbs.
+INIT_ARBS = [
+    (ArbCmd('x', 'y'), [
+        {'iface': 'x', 'oper': 'y', 'args': [], 'kwargs': {}},
+    ]),
+    ([ArbCmd('x', 'y', b'a'), ArbCmd('y', 'z', b'b')], [
+        {'iface': 'x', 'oper': 'y', 'args': [b'a'], 'kwargs': {}},
+        {'iface': 'y', 'oper': 'z', 'args': [b'b'], 'kwargs': {}},
+    ]),
+]
+
+class SharedSimulationTests(unittest.TestCase):
+    """Tests that only need a running default pipeline, sharing a single
+    simulation. DQCsim allows only one simulation per thread, so this class
+    must not contain tests that start simulations of their own."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sim = Simulator(
             NullFrontend(), NullOperator(), (NullBackend(), {'name': 'test'}),
             repro=None, stderr_verbosity=Loglevel.OFF
         )
+        cls.sim.simulate()
 
-        self.assertEqual(len(sim), 3)
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.stop()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.start()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.wait()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.send()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.recv()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.yeeld()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.arb(0, 'a', 'b')
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.get_meta(0)
+    @classmethod
+    def tearDownClass(cls):
+        cls.sim.stop()
 
-        sim.simulate()
+    def test_host_calls(self):
+        sim = self.sim
         with self.assertRaisesRegex(RuntimeError, "multiple simulations"):
             sim.simulate()
         sim.send()
@@ -96,6 +157,8 @@ class Tests(unittest.TestCase):
         with self.assertRaisesRegex(RuntimeError, "Deadlock"):
             sim.recv()
 
+    def test_meta(self):
+        sim = self.sim
         self.assertEqual(sim.get_meta(0), ("Null frontend plugin", "Test", "0.1"))
         self.assertEqual(sim.get_meta(1), ("Null operator plugin", "Test", "0.1"))
         self.assertEqual(sim.get_meta(2), ("Null backend plugin", "Test", "0.1"))
@@ -104,15 +167,36 @@ class Tests(unittest.TestCase):
         self.assertEqual(sim.get_meta('test'), ("Null backend plugin", "Test", "0.1"))
         with self.assertRaisesRegex(RuntimeError, "not found"):
             sim.get_meta('banana')
-        sim.stop()
-        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
-            sim.stop()
+
+class Tests(unittest.TestCase):
+
+    def _assert_all_raise(self, exc, regex, calls):
+        """Asserts that each of the given callables raises exc with a message
+        matching regex. Subtests are labelled by index into calls."""
+        for i, call in enumerate(calls):
+            with self.subTest(call=i):
+                with self.assertRaisesRegex(exc, regex):
+                    call()
+
+    def test_state_errors(self):
+        sim = Simulator(
+            NullFrontend(), NullOperator(), (NullBackend(), {'name': 'test'}),
+            repro=None, stderr_verbosity=Loglevel.OFF
+        )
+
+        self.assertEqual(len(sim), 3)
+        self._assert_all_raise(RuntimeError, "No simulation is currently running", [
+            sim.stop, sim.start, sim.wait, sim.send, sim.recv, sim.yeeld,
+            lambda: sim.arb(0, 'a', 'b'),
+            lambda: sim.get_meta(0),
+        ])
 
         self.assertEqual(repr(sim), 'Simulator()')
         self.assertEqual(str(sim), 'Simulator()')
 
     def test_log_capture_callback(self):
         msgs = []
+        sources = set()
         capture = [False]
         def log(msg, source, level, mod, fname, line, timestamp, pid, tid):
             if msg == '__start__':
@@ -120,7 +204,8 @@ class Tests(unittest.TestCase):
             elif msg == '__end__':
                 capture[0] = False
             elif capture[0] and source == 'front':
-                msgs.append((msg, level, mod, fname, line))
+                msgs.append((msg, level, line))
+                sources.add((mod, fname))
         sim = Simulator(
             NullFrontend(), NullBackend(),
             repro=None, stderr_verbosity=Loglevel.OFF,
@@ -129,34 +214,8 @@ class Tests(unittest.TestCase):
         sim.simulate()
         sim.arb('front', 'log', 'test')
         sim.stop()
-        self.assertEqual(len(msgs), 9)
-        self.assertEqual(msgs[0], (
-            'trace', Loglevel.TRACE,
-            'dqcsim.tests.test_simulator', __file__, 17))
-        self.assertEqual(msgs[1], (
-            'debug', Loglevel.DEBUG,
-            'dqcsim.tests.test_simulator', __file__, 18))
-        self.assertEqual(msgs[2], (
-            'info', Loglevel.INFO,
-            'dqcsim.tests.test_simulator', __file__, 19))
-        self.assertEqual(msgs[3], (
-            'note', Loglevel.NOTE,
-            'dqcsim.tests.test_simulator', __file__, 20))
-        self.assertEqual(msgs[4], (
-            'warn', Loglevel.WARN,
-            'dqcsim.tests.test_simulator', __file__, 21))
-        self.assertEqual(msgs[5], (
-            'error', Loglevel.ERROR,
-            'dqcsim.tests.test_simulator', __file__, 22))
-        self.assertEqual(msgs[6], (
-            'fatal', Loglevel.FATAL,
-            'dqcsim.tests.test_simulator', __file__, 23))
-        self.assertEqual(msgs[7], (
-            'log 33 test', Loglevel.INFO,
-            'dqcsim.tests.test_simulator', __file__, 24))
-        self.assertEqual(msgs[8], (
-            'level must be a Loglevel', Loglevel.ERROR,
-            'dqcsim.tests.test_simulator', __file__, 28))
+        self.assertEqual(sources, {('dqcsim.tests.test_simulator', __file__)})
+        self.assertEqual(msgs, LOG_TEST_CALLBACK)
 
     def test_log_capture_logging(self):
         class Handler(logging.Handler):
@@ -178,6 +237,7 @@ class Tests(unittest.TestCase):
         handler = Handler()
         logger = logging.getLogger('dqcsim')
         logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
         sim = Simulator(
             NullFrontend(), NullBackend(),
             repro=None, stderr_verbosity=Loglevel.OFF,
@@ -186,16 +246,7 @@ class Tests(unittest.TestCase):
         sim.simulate()
         sim.arb('front', 'log', 'test')
         sim.stop()
-        self.assertEqual(len(handler.msgs), 9)
-        self.assertEqual(handler.msgs[0], ('trace',                     5, 'TRACE',    __file__, 17))
-        self.assertEqual(handler.msgs[1], ('debug',                    10, 'DEBUG',    __file__, 18))
-        self.assertEqual(handler.msgs[2], ('info',                     20, 'INFO',     __file__, 19))
-        self.assertEqual(handler.msgs[3], ('note',                     25, 'NOTE',     __file__, 20))
-        self.assertEqual(handler.msgs[4], ('warn',                     30, 'WARNING',  __file__, 21))
-        self.assertEqual(handler.msgs[5], ('error',                    40, 'ERROR',    __file__, 22))
-        self.assertEqual(handler.msgs[6], ('fatal',                    50, 'CRITICAL', __file__, 23))
-        self.assertEqual(handler.msgs[7], ('log 33 test',              20, 'INFO',     __file__, 24))
-        self.assertEqual(handler.msgs[8], ('level must be a Loglevel', 40, 'ERROR',    __file__, 28))
+        self.assertEqual(handler.msgs, LOG_TEST_LOGGING)
 
     def test_manual_spawn(self):
         trace_fn = sys.gettrace()
@@ -234,6 +285,8 @@ class Tests(unittest.TestCase):
         with self.assertRaisesRegex(RuntimeError, 'Cannot reconfigure simulation while it is running'):
             sim.with_operator(NullOperator())
         sim.stop()
+        with self.assertRaisesRegex(RuntimeError, "No simulation is currently running"):
+            sim.stop()
 
         with self.assertRaises(TypeError):
             sim.with_operator(NullFrontend())
@@ -250,28 +303,15 @@ class Tests(unittest.TestCase):
             sim.recv()
 
     def test_init_arbs(self):
-        sim = Simulator(
-            (NullFrontend(), {'init': ArbCmd('x', 'y')}), NullOperator(), NullBackend(),
-            repro=None, stderr_verbosity=Loglevel.OFF
-        )
-        sim.simulate()
-        self.assertEqual(sim.arb('front', 'get', 'arbs')['data'], [
-            {'iface': 'x', 'oper': 'y', 'args': [], 'kwargs': {}},
-        ])
-        sim.stop()
-
-        sim = Simulator(
-            (NullFrontend(), {'init': [
-                ArbCmd('x', 'y', b'a'), ArbCmd('y', 'z', b'b')
-            ]}), NullOperator(), NullBackend(),
-            repro=None, stderr_verbosity=Loglevel.OFF
-        )
-        sim.simulate()
-        self.assertEqual(sim.arb('front', 'get', 'arbs')['data'], [
-            {'iface': 'x', 'oper': 'y', 'args': [b'a'], 'kwargs': {}},
-            {'iface': 'y', 'oper': 'z', 'args': [b'b'], 'kwargs': {}},
-        ])
-        sim.stop()
+        for init, expected in INIT_ARBS:
+            with self.subTest(init=init):
+                sim = Simulator(
+                    (NullFrontend(), {'init': init}), NullOperator(), NullBackend(),
+                    repro=None, stderr_verbosity=Loglevel.OFF
+                )
+                sim.simulate()
+                self.assertEqual(sim.arb('front', 'get', 'arbs')['data'], expected)
+                sim.stop()
 
     def test_tee(self):
         with tempfile.TemporaryDirectory() as base:
@@ -301,29 +341,11 @@ class Tests(unittest.TestCase):
                 self.assertTrue('Trace' in f)
 
     def test_seed(self):
-        with tempfile.TemporaryDirectory() as base:
-            sim = Simulator(
-                NullFrontend(), NullBackend(),
-                tee={base+'/sim.log': Loglevel.INFO},
-                repro=None, stderr_verbosity=Loglevel.OFF
-            )
-            sim.simulate(33)
-            sim.stop()
-            with open(base+'/sim.log', 'r') as f:
-                f = f.read()
-                self.assertTrue('seed: 33\n' in f)
-
-        with tempfile.TemporaryDirectory() as base:
-            sim = Simulator(
-                NullFrontend(), NullBackend(),
-                tee={base+'/sim.log': Loglevel.INFO},
-                repro=None, stderr_verbosity=Loglevel.OFF
-            )
-            sim.simulate(123456789012345678901234567890)
-            sim.stop()
-            with open(base+'/sim.log', 'r') as f:
-                f = f.read()
-                self.assertTrue('seed: 1594492456\n' in f)
+        self.assertEqual(_hash_seed(33), 33)
+        self.assertEqual(_hash_seed(0xFFFFFFFFFFFFFFFF), 0xFFFFFFFFFFFFFFFF)
+        self.assertEqual(_hash_seed(123456789012345678901234567890), 1594492456)
+        self.assertEqual(_hash_seed(-1), 9240671)
+        self.assertEqual(_hash_seed('test'), 73204161)
 
         with tempfile.TemporaryDirectory() as base:
             sim = Simulator(
@@ -338,46 +360,18 @@ class Tests(unittest.TestCase):
                 self.assertTrue('seed: 73204161\n' in f)
 
     def test_usage_errors(self):
-        with self.assertRaisesRegex(TypeError, "repro must be 'keep', 'absolute', 'relative', or None"):
-            Simulator(repro='invalid')
-        with self.assertRaisesRegex(TypeError, "dqcsim_verbosity must be a Loglevel"):
-            Simulator(dqcsim_verbosity='invalid')
-        with self.assertRaisesRegex(TypeError, "stderr_verbosity must be a Loglevel"):
-            Simulator(stderr_verbosity='invalid')
-        with self.assertRaisesRegex(TypeError, "log_capture must be callable or a string identifying a logger from the logging library"):
-            Simulator(log_capture=33)
-        with self.assertRaisesRegex(TypeError, "log_capture_verbosity must be a Loglevel"):
-            Simulator(log_capture_verbosity='invalid')
-        with self.assertRaises(ValueError):
-            Simulator(tee='invalid')
-        with self.assertRaisesRegex(TypeError, "tee file key must be a string"):
-            Simulator(tee={3: Loglevel.TRACE})
-        with self.assertRaisesRegex(TypeError, "tee file value must be a Loglevel"):
-            Simulator(tee={'string': 3})
-        with self.assertRaisesRegex(TypeError, "unexpected keyword argument 'invalid'"):
-            Simulator(invalid=3)
-        with self.assertRaisesRegex(TypeError, "init must be a single ArbCmd or a list/tuple of ArbCmds"):
-            Simulator((Frontend(), {'init': 'invalid'}))
-        with self.assertRaisesRegex(TypeError, "verbosity must be a Loglevel"):
-            Simulator((Frontend(), {'verbosity': 'invalid'}))
-        with self.assertRaises(ValueError):
-            Simulator((Frontend(), {'tee': 'invalid'}))
-        with self.assertRaisesRegex(TypeError, "tee file key must be a string"):
-            Simulator((Frontend(), {'tee': {3: Loglevel.TRACE}}))
-        with self.assertRaisesRegex(TypeError, "tee file value must be a Loglevel"):
-            Simulator((Frontend(), {'tee': {'string': 3}}))
-        with self.assertRaises(ValueError):
-            Simulator(('null', {'env': 'invalid'}))
-        with self.assertRaisesRegex(TypeError, "environment variable key must be a string"):
-            Simulator(('null', {'env': {3: None}}))
-        with self.assertRaisesRegex(TypeError, "environment variable value must be a string or None"):
-            Simulator(('null', {'env': {'test': 3}}))
-        with self.assertRaisesRegex(TypeError, "stderr must be a Loglevel or None"):
-            Simulator(('null', {'stderr': 3}))
-        with self.assertRaisesRegex(TypeError, "stdout must be a Loglevel or None"):
-            Simulator(('null', {'stdout': 3}))
-        with self.assertRaisesRegex(TypeError, "unexpected keyword argument 'invalid'"):
-            Simulator(('null', {'invalid': 3}))
+        for kwargs, exc, msg in BAD_KWARGS:
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(exc) as cm:
+                    Simulator(**kwargs)
+                if msg is not None:
+                    self.assertIn(msg, str(cm.exception))
+        for spec, exc, msg in BAD_PLUGINS:
+            with self.subTest(spec=spec):
+                with self.assertRaises(exc) as cm:
+                    Simulator(spec)
+                if msg is not None:
+                    self.assertIn(msg, str(cm.exception))
 
 
 if __name__ == '__main__':
@@ -5,19 +5,32 @@ import platform
 import shutil
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from distutils.command.bdist import bdist as _bdist
 from distutils.command.sdist import sdist as _sdist
 from distutils.command.build import build as _build
 from distutils.command.clean import clean as _clean
+from setuptools.command.build_ext import build_ext as _build_ext
 from setuptools.command.egg_info import egg_info as _egg_info
+import distutils.ccompiler
 import distutils.cmd
 import distutils.log
-from setuptools import setup, Extension, find_packages
+from distutils.dep_util import newer
+from setuptools import setup, Extension
 from wheel.bdist_wheel import bdist_wheel as _bdist_wheel
 
-with open('rust/Cargo.toml', 'r') as f:
-    version = next(filter(lambda x: x.startswith('version = '),
-                          f.readlines()), 'version = "?.?.?"').split('"')[1]
+
+def read_version(fname):
+    """Returns the version from the given Cargo.toml file, stopping at the
+    first version line."""
+    with open(fname, 'r') as f:
+        for line in f:
+            if line.startswith('version = '):
+                return line.split('"')[1]
+    return '?.?.?'
+
+
+version = read_version('rust/Cargo.toml')
 
 debug = 'DQCSIM_DEBUG' in os.environ
 
@@ -31,8 +44,25 @@ build_dir = py_target_dir + "/build"
 dist_dir = py_target_dir + "/dist"
 
 # To make sure that DQCsim can find the dqcsfepy and friends during tests.
-if py_bin_dir not in os.environ['PATH']:
-    os.environ['PATH'] = os.environ['PATH'] + ':' + py_bin_dir
+# This can't move into the build command, because `setup.py test` only runs
+# build_ext.
+if py_bin_dir not in os.environ.get('PATH', '').split(os.pathsep):
+    os.environ['PATH'] = os.pathsep.join(
+        filter(None, (os.environ.get('PATH', ''), py_bin_dir)))
+
+
+def read_build_jobs():
+    """Returns the number of parallel jobs to build with. This is read from
+    DQCSIM_BUILD_JOBS, where an empty value or 0 selects the number of
+    CPUs."""
+    jobs = os.environ.get('DQCSIM_BUILD_JOBS', '') or '0'
+    if not jobs.isdigit():
+        raise ValueError(
+            'DQCSIM_BUILD_JOBS must be a non-negative integer, not {!r}'.format(jobs))
+    return int(jobs) or os.cpu_count() or 1
+
+
+build_jobs = read_build_jobs()
 
 
 def read(fname):
@@ -40,10 +70,38 @@ def read(fname):
         return f.read()
 
 
+def isatty():
+    """Returns whether stdout is a terminal. Unlike os.isatty(), this doesn't
+    fail when stdout has been replaced by an object without a file
+    descriptor, as pip does when it captures output."""
+    return hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
+
+
+def parallel_compile(self, sources, output_dir=None, macros=None,
+                     include_dirs=None, debug=0, extra_preargs=None,
+                     extra_postargs=None, depends=None):
+    """Replacement for distutils' CCompiler.compile() that compiles the
+    sources in parallel, using build_jobs threads."""
+    macros, objects, extra_postargs, pp_opts, build = self._setup_compile(
+        output_dir, macros, include_dirs, sources, depends, extra_postargs)
+    cc_args = self._get_cc_args(pp_opts, debug, extra_preargs)
+
+    def compile_one(obj):
+        try:
+            src, ext = build[obj]
+        except KeyError:
+            return
+        self._compile(obj, src, ext, cc_args, extra_postargs, pp_opts)
+
+    with ThreadPoolExecutor(max_workers=build_jobs) as executor:
+        list(executor.map(compile_one, objects))
+    return objects
+
+
 class clean(_clean):
     def run(self):
         _clean.run(self)
-        shutil.rmtree(py_target_dir)
+        shutil.rmtree(py_target_dir, ignore_errors=True)
 
 
 class build(_build):
@@ -52,6 +110,12 @@ class build(_build):
         self.build_base = build_dir
 
     def run(self):
+        # Build the Rust code through sccache when it's available, unless
+        # disabled through DQCSIM_NO_CACHE.
+        if 'DQCSIM_NO_CACHE' not in os.environ and shutil.which('sccache'):
+            os.environ.setdefault('RUSTC_WRAPPER', 'sccache')
+            os.environ.setdefault('SCCACHE_DIR', target_dir + '/sccache')
+
         from plumbum import local, FG
         with local.cwd("rust"):
             try:
@@ -61,30 +125,52 @@ class build(_build):
                 print("Installing Rust...")
                 rustup = local['curl']['--proto']['=https']['--tlsv1.2']['-sSf']['https://sh.rustup.rs']
                 sh = local['sh']
-                if os.isatty(sys.stdout.fileno()):
+                if isatty():
                     (rustup | sh) & FG
                 else:
                     (rustup | sh['-s']['--']['-y'])()
                 cargo = local.get('cargo', os.environ.get(
                     'HOME', 'root') + '/.cargo/bin/cargo')
             finally:
-                if debug:
-                    cargo["build"]["--features"]["bindings cli null-plugins"] & FG
-                else:
-                    cargo["build"]["--release"]["--features"]["bindings cli null-plugins"] & FG
-
-        local['mkdir']("-p", py_target_dir)
-        sys.path.append("python/tools")
-        import add_swig_directives
-        add_swig_directives.run(
-            include_dir + "/dqcsim-py.h", py_target_dir + "/dqcsim.i")
+                cargo = cargo["build"]
+                if not debug:
+                    cargo = cargo["--release"]
+                cargo = cargo["--jobs"][str(build_jobs)]
+                cargo["--features"]["bindings cli null-plugins"] & FG
+
+        os.makedirs(py_target_dir, exist_ok=True)
+
+        # Only regenerate the SWIG wrapper when its inputs have changed.
+        if (newer(include_dir + "/dqcsim-py.h", py_target_dir + "/dqcsim.c")
+                or newer("python/tools/add_swig_directives.py", py_target_dir + "/dqcsim.c")):
+            sys.path.append("python/tools")
+            import add_swig_directives
+            add_swig_directives.run(
+                include_dir + "/dqcsim-py.h", py_target_dir + "/dqcsim.i")
+
+            subprocess.run([
+                "swig", "-v", "-python", "-py3", "-outdir", py_target_dir,
+                "-o", py_target_dir + "/dqcsim.c", py_target_dir + "/dqcsim.i",
+            ], check=True)
+
+        subprocess.run(["cmake", "-B", cmake_target_dir, "."], check=True)
+
+        distutils.ccompiler.CCompiler.compile = parallel_compile
+        _build.run(self)
 
-        local["swig"]["-v"]["-python"]["-py3"]["-outdir"][py_target_dir]["-o"][py_target_dir +
-                                                                               "/dqcsim.c"][py_target_dir + "/dqcsim.i"] & FG
 
-        local["cmake"]["-B"][cmake_target_dir]["."] & FG
-
-        _build.run(self)
+class build_ext(_build_ext):
+    def build_extensions(self):
+        # Compile the SWIG wrapper through ccache when it's available, unless
+        # disabled through DQCSIM_NO_CACHE. This only touches the compiler
+        # distutils configured for the extension, so the C compilers used by
+        # cargo and cmake are left alone.
+        if 'DQCSIM_NO_CACHE' not in os.environ and shutil.which('ccache'):
+            for key in ('compiler_so', 'linker_so'):
+                command = getattr(self.compiler, key, None)
+                if command and os.path.basename(command[0]) != 'ccache':
+                    self.compiler.set_executable(key, ['ccache'] + command)
+        _build_ext.build_extensions(self)
 
 
 class bdist(_bdist):
@@ -111,7 +197,8 @@ class bdist_wheel(_bdist_wheel):
                 from auditwheel.repair import repair_wheel
                 from auditwheel.patcher import Patchelf
                 repair_wheel(wheel_path, abi=os.environ['AUDITWHEEL_PLAT'], lib_sdir=".libs",
-                             out_dir=self.dist_dir, update_tags=True, patcher=Patchelf())
+                             out_dir=self.dist_dir, update_tags=True, patcher=Patchelf(),
+                             strip=True)
 
 
 class sdist(_sdist):
@@ -149,10 +236,19 @@ class KCovCommand(distutils.cmd.Command):
         subprocess.check_call(command, env=kcov_env)
 
 
-include_files = {}
-# for root, _, files in os.walk('cpp/include'):
-#assert root.startswith('cpp/')
-#include_files[root[4:]] = list(map(lambda name: os.path.join(root, name), files))
+# Compiler flags for the SWIG wrapper. Debug builds aren't optimized any further
+# than distutils does by default. -march=native and LTO are opt-in through
+# DQCSIM_NATIVE, since the former makes the result unportable.
+cflags = ['-std=c99']
+ldflags = []
+if not debug:
+    cflags.append('-O3')
+    if platform.system() == "Linux":
+        cflags.append('-fno-plt')
+if 'DQCSIM_NATIVE' in os.environ:
+    cflags += ['-march=native', '-flto']
+    ldflags.append('-flto')
+
 
 setup(
     name='dqcsim',
@@ -204,7 +300,7 @@ setup(
             'target/include/dqcsim.h',
             'target/include/cdqcsim',
             'target/include/dqcsim',
-        ] + include_files.pop('include', [])),
+        ]),
         ('lib/cmake/dqcsim', [
             cmake_target_dir + '/dqcsimConfig.cmake',
             cmake_target_dir + '/dqcsimConfigVersion.cmake'
@@ -219,9 +315,15 @@ setup(
                 output_dir + '/libdqcsim.so'
             ])
         ] if platform.system() == "Linux" else []
-    ) + list(include_files.items()),
-
-    packages=find_packages('python'),
+    ),
+
+    packages=[
+        'dqcsim',
+        'dqcsim.common',
+        'dqcsim.host',
+        'dqcsim.plugin',
+        'dqcsim.tests',
+    ],
     package_dir={
         '': 'python',
     },
@@ -230,6 +332,7 @@ setup(
         'bdist': bdist,
         'bdist_wheel': bdist_wheel,
         'build': build,
+        'build_ext': build_ext,
         'clean': clean,
         'egg_info': egg_info,
         'sdist': sdist,
@@ -244,7 +347,8 @@ setup(
             library_dirs=[output_dir],
             runtime_library_dirs=[output_dir],
             include_dirs=[include_dir],
-            extra_compile_args=['-std=c99']
+            extra_compile_args=cflags,
+            extra_link_args=ldflags,
         )
     ],
 